@@ -92,6 +92,11 @@ class Config:
         """Local keys directory for NSZ verification."""
         return os.path.expanduser("~/.switch")
 
+    @property
+    def cache_dir(self) -> str:
+        """Local directory for caches persisted across sessions."""
+        return os.path.expanduser("~/.cache/drive-scripts")
+
 
 # Global singleton - can be replaced for testing or user customization
 config = Config()
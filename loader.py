@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import codecs
 import os
 import subprocess
 import sys
@@ -22,6 +23,11 @@ DRIVE_ROOT = os.getenv("DRIVE_ROOT", "/content/drive")
 PORT = int(os.getenv("PORT", 8000))
 IS_COLAB = "google.colab" in sys.modules or os.path.exists("/content")
 
+# Set by log_reader when uvicorn reports startup, so wait_for_server wakes on
+# that line instead of polling /health until the port answers.
+STARTUP_MARKER = "Application startup complete"
+_startup_seen = threading.Event()
+
 
 def ensure_repo() -> None:
     """Clone or pull the repository (Colab only)."""
@@ -148,16 +154,33 @@ def run_server():
         stdin=subprocess.DEVNULL,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True,
+        bufsize=0,
         close_fds=True,
     )
 
     def log_reader():
+        # Forward whatever is available in one chunk per read rather than one
+        # decode + flushed print per line; the incremental decoder keeps
+        # multi-byte characters split across reads intact.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        carry = ""
         try:
             if process.stdout:
-                for line in iter(process.stdout.readline, ""):
-                    if line:
-                        print(line, end="", flush=True)
+                while chunk := process.stdout.read(65536):
+                    text = decoder.decode(chunk)
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+                    if not _startup_seen.is_set():
+                        # Keep a marker-sized tail so a line split across
+                        # reads is still recognised
+                        window = carry + text
+                        if STARTUP_MARKER in window:
+                            _startup_seen.set()
+                        carry = window[-len(STARTUP_MARKER) :]
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    sys.stdout.write(tail)
+                    sys.stdout.flush()
         except Exception as e:
             print(f"\n[Log Reader Error] {e}")
 
@@ -168,12 +191,24 @@ def run_server():
     return process
 
 
-def wait_for_server(port: int, timeout: int = 10) -> bool:
-    """Wait for the server to be ready by polling /health."""
+def wait_for_server(
+    port: int, timeout: int = 10, process: subprocess.Popen | None = None
+) -> bool:
+    """Wait for the server to be ready, then confirm it via /health.
+
+    With a piped server process this sleeps until log_reader sees uvicorn's
+    startup line; otherwise /health is polled. Gives up early if the process
+    exits.
+    """
     import urllib.request
 
-    start = time.time()
-    while time.time() - start < timeout:
+    piped = process is not None and process.stdout is not None
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        if process is not None and process.poll() is not None:
+            return False
+        if piped and not _startup_seen.wait(min(0.5, remaining)):
+            continue
         try:
             with urllib.request.urlopen(
                 f"http://localhost:{port}/health", timeout=1
@@ -199,7 +234,7 @@ def main() -> None:
     print(f"Starting Web Server on port {PORT}...", end=" ", flush=True)
     server_proc = run_server()
 
-    if wait_for_server(PORT):
+    if wait_for_server(PORT, process=server_proc):
         print("done")
     else:
         if server_proc.poll() is not None:
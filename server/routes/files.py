@@ -7,10 +7,13 @@ router = APIRouter()
 
 
 @router.get("/list")
-async def list_files(path: str = Query(..., description="Absolute path to list")):
+async def list_files(
+    path: str = Query(..., description="Absolute path to list"),
+    fresh: bool = Query(False, description="Bypass the directory listing cache"),
+):
     """List files and directories in a path."""
     try:
-        return FileService.list_directory(path)
+        return FileService.list_directory(path, use_cache=not fresh)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -19,10 +22,11 @@ async def list_files(path: str = Query(..., description="Absolute path to list")
 async def search_files(
     root: str = Query(..., description="Root directory to search"),
     type: str = Query(..., description="Type of files to search for (archives, games)"),
+    fresh: bool = Query(False, description="Bypass the search result cache"),
 ):
     """Search for files of a specific type."""
     try:
-        return FileService.search_files(root, type)
+        return FileService.search_files(root, type, use_cache=not fresh)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
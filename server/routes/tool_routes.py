@@ -1,22 +1,33 @@
 from fastapi import APIRouter
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from tools.base import BaseTool
 from tools.registry import discover_tools
 
 router = APIRouter()
 
+# Metadata built for a given registry list; discover_tools() returns the same
+# list object until the plugins are reloaded, so identity is a safe cache key.
+_metadata_cache: Optional[Tuple[List[BaseTool], List[Dict]]] = None
+
 
 @router.get("", response_model=List[Dict])
 @router.get("/", response_model=List[Dict])
 async def list_tools() -> List[Dict]:
     """List all available tools and their metadata."""
+    global _metadata_cache
     tools = discover_tools()
-    return [
-        {
-            "id": tool.name,
-            "title": tool.title,
-            "description": tool.description,
-            "icon": tool.icon,
-            "order": tool.order,
-        }
-        for tool in tools
-    ]
+    if _metadata_cache is None or _metadata_cache[0] is not tools:
+        _metadata_cache = (
+            tools,
+            [
+                {
+                    "id": tool.name,
+                    "title": tool.title,
+                    "description": tool.description,
+                    "icon": tool.icon,
+                    "order": tool.order,
+                }
+                for tool in tools
+            ],
+        )
+    return _metadata_cache[1]
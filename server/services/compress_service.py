@@ -2,14 +2,20 @@ import os
 import shutil
 import asyncio
 import threading
-import time
-from multiprocessing import Manager, cpu_count
+from multiprocessing import cpu_count
 from pathlib import Path
 from typing import List, Tuple, Callable, Optional
 
 from config import config
-from tools.shared.utils import copy_with_progress, ensure_python_modules, fmt_bytes
+from tools.shared.utils import (
+    copy_with_progress,
+    ensure_python_modules,
+    fmt_bytes,
+    invalidate_find_cache,
+    stage_keys,
+)
 from server.services.sse_service import sse_service
+from server.services.verify_service import VerifyService
 
 
 class CompressService:
@@ -27,17 +33,12 @@ class CompressService:
             await sse_service.send_event(
                 job_id, "log", {"message": "Staging decryption keys..."}
             )
-            ok, key_path = CompressService._stage_keys()
+            ok, key_path = stage_keys()
             if not ok:
                 raise RuntimeError(f"prod.keys missing - place in {config.keys_dir}/")
 
-            # Load keys into nsz
-            from nsz.nut import Keys
-
-            try:
-                Keys.load(key_path)
-            except Exception:
-                pass
+            # Load keys into nsz and resolve its verify entry point
+            nsz_verify = VerifyService.load_nsz_verify(key_path)
 
             compressed_count = failed_count = 0
             total_files = len(files)
@@ -48,6 +49,14 @@ class CompressService:
                 out_ext = ".nsz" if ext == ".nsp" else ".xcz"
                 local_input = os.path.join(config.temp_dir, basename)
                 drive_output = os.path.splitext(src)[0] + out_ext
+                output_name = os.path.basename(drive_output)
+
+                # Step labels are fixed for the whole file, build them once
+                counter = f"({i}/{total_files})"
+                copy_step = f"[1/4] Copying {counter}"
+                compress_step = f"[2/4] Compressing {counter}"
+                verify_step = f"[3/4] Verifying {counter}"
+                upload_step = f"[4/4] Uploading {counter}"
 
                 shutil.rmtree(config.temp_dir, ignore_errors=True)
                 os.makedirs(config.temp_dir, exist_ok=True)
@@ -67,7 +76,7 @@ class CompressService:
                                     job_id,
                                     "progress",
                                     {
-                                        "step": f"[1/4] Copying ({i}/{total_files})",
+                                        "step": copy_step,
                                         "current": d,
                                         "total": t,
                                         "percent": round(d / t * 100, 2),
@@ -91,7 +100,7 @@ class CompressService:
                                 job_id,
                                 "progress",
                                 {
-                                    "step": f"[2/4] Compressing ({i}/{total_files})",
+                                    "step": compress_step,
                                     "current": d,
                                     "total": t,
                                     "percent": round(d / t * 100, 2) if t > 0 else 0,
@@ -136,12 +145,11 @@ class CompressService:
 
                     # Step 3: Verify (Optional)
                     if verify_after:
+                        verify_name = os.path.basename(local_output)
                         await sse_service.send_event(
                             job_id,
                             "log",
-                            {
-                                "message": f"Verifying {os.path.basename(local_output)}..."
-                            },
+                            {"message": f"Verifying {verify_name}..."},
                         )
 
                         def on_verify_prog(d, t):
@@ -150,20 +158,23 @@ class CompressService:
                                     job_id,
                                     "progress",
                                     {
-                                        "step": f"[3/4] Verifying ({i}/{total_files})",
+                                        "step": verify_step,
                                         "current": d,
                                         "total": t,
                                         "percent": round(d / t * 100, 2)
                                         if t > 0
                                         else 0,
-                                        "message": os.path.basename(local_output),
+                                        "message": verify_name,
                                     },
                                 ),
                                 loop,
                             )
 
                         ok, err = await asyncio.to_thread(
-                            CompressService._verify_file, local_output, on_verify_prog
+                            CompressService._verify_file,
+                            local_output,
+                            on_verify_prog,
+                            nsz_verify,
                         )
                         if not ok:
                             raise RuntimeError(f"Verify failed: {err}")
@@ -182,11 +193,11 @@ class CompressService:
                                     job_id,
                                     "progress",
                                     {
-                                        "step": f"[4/4] Uploading ({i}/{total_files})",
+                                        "step": upload_step,
                                         "current": d,
                                         "total": t,
                                         "percent": round(d / t * 100, 2),
-                                        "message": os.path.basename(drive_output),
+                                        "message": output_name,
                                     },
                                 ),
                                 loop,
@@ -195,16 +206,17 @@ class CompressService:
 
                     await asyncio.to_thread(do_upload)
 
-                    # Safe to delete original
-                    if os.path.exists(src):
+                    # Safe to delete original. Removing and ignoring a missing
+                    # file costs one Drive round-trip instead of two.
+                    try:
                         os.remove(src)
+                    except FileNotFoundError:
+                        pass
 
                     await sse_service.send_event(
                         job_id,
                         "log",
-                        {
-                            "message": f"OK    {basename} -> {os.path.basename(drive_output)}"
-                        },
+                        {"message": f"OK    {basename} -> {output_name}"},
                     )
                     compressed_count += 1
 
@@ -213,11 +225,15 @@ class CompressService:
                         job_id, "log", {"message": f"FAIL  {basename} - {str(e)}"}
                     )
                     failed_count += 1
-                    if os.path.exists(drive_output):
+                    try:
                         os.remove(drive_output)
+                    except FileNotFoundError:
+                        pass
 
                 finally:
                     shutil.rmtree(config.temp_dir, ignore_errors=True)
+                    # Drive gained an output and may have lost the source
+                    invalidate_find_cache()
 
                 await sse_service.send_event(
                     job_id,
@@ -236,17 +252,6 @@ class CompressService:
         except Exception as e:
             await sse_service.send_event(job_id, "error", {"message": str(e)})
 
-    @staticmethod
-    def _stage_keys() -> Tuple[bool, str]:
-        os.makedirs(config.local_keys_dir, exist_ok=True)
-        key_files = ["prod.keys", "title.keys", "keys.txt"]
-        for name in key_files:
-            src = os.path.join(config.keys_dir, name)
-            if os.path.exists(src):
-                shutil.copy2(src, os.path.join(config.local_keys_dir, name))
-        prod = os.path.join(config.local_keys_dir, "prod.keys")
-        return os.path.isfile(prod) and os.path.getsize(prod) > 0, prod
-
     @staticmethod
     def _compress_file(
         input_path: str, output_dir: str, on_progress: Callable[[int, int], None]
@@ -271,37 +276,43 @@ class CompressService:
 
         file_path = Path(input_path)
         out_dir = Path(output_dir)
-        with Manager() as manager:
-            status_report = manager.list()
-            status_report.append([0, 0, 1, "Starting"])
-            res = [None]
-            err = [None]
+        # The worker is a thread in this process, so a plain list is enough;
+        # nsz only ever replaces status_report[0] wholesale.
+        status_report = [[0, 0, 1, "Starting"]]
+        res = [None]
+        err = [None]
+        finished = threading.Event()
 
-            def worker():
-                try:
-                    res[0] = solidCompress(
-                        filePath=file_path,
-                        compressionLevel=18,
-                        keep=False,
-                        outputDir=out_dir,
-                        threads=3,
-                        statusReport=status_report,
-                        id=0,
-                    )
-                except Exception as e:
-                    err[0] = e
+        def worker():
+            try:
+                res[0] = solidCompress(
+                    filePath=file_path,
+                    compressionLevel=18,
+                    keep=False,
+                    outputDir=out_dir,
+                    threads=3,
+                    statusReport=status_report,
+                    id=0,
+                )
+            except Exception as e:
+                err[0] = e
+            finally:
+                finished.set()
 
-            t = threading.Thread(target=worker)
-            t.start()
-            while t.is_alive():
-                if len(status_report) > 0:
-                    read, _, total, _ = status_report[0]
+        t = threading.Thread(target=worker)
+        t.start()
+        last = None
+        while not finished.wait(0.1):
+            if len(status_report) > 0:
+                read, _, total, _ = status_report[0]
+                # Only report when the counters moved since the last tick
+                if (read, total) != last:
+                    last = (read, total)
                     on_progress(read, total)
-                time.sleep(0.1)
-            t.join()
-            if err[0]:
-                raise err[0]
-            return res[0]
+        t.join()
+        if err[0]:
+            raise err[0]
+        return res[0]
 
     @staticmethod
     def _compress_xci(
@@ -315,6 +326,7 @@ class CompressService:
         output_path = out_dir / (file_path.stem + ".xcz")
         res = [None]
         err = [None]
+        finished = threading.Event()
 
         def worker():
             try:
@@ -328,14 +340,19 @@ class CompressService:
                 )
             except Exception as e:
                 err[0] = e
+            finally:
+                finished.set()
 
         t = threading.Thread(target=worker)
         t.start()
-        while t.is_alive():
+        expected = int(input_size * 0.7)
+        last = -1
+        while not finished.wait(0.1):
             if output_path.exists():
                 curr = output_path.stat().st_size
-                on_progress(curr, int(input_size * 0.7))
-            time.sleep(0.1)
+                if curr != last:
+                    last = curr
+                    on_progress(curr, expected)
         t.join()
         if err[0]:
             raise err[0]
@@ -343,39 +360,47 @@ class CompressService:
 
     @staticmethod
     def _verify_file(
-        path: str, on_progress: Callable[[int, int], None]
+        path: str,
+        on_progress: Callable[[int, int], None],
+        nsz_verify: Optional[Callable],
     ) -> Tuple[bool, str]:
-        from nsz.NszDecompressor import verify
+        if nsz_verify is None:
+            return False, "nsz verify unavailable (could not load keys)"
 
         file_path = Path(path)
         total_size = file_path.stat().st_size
-        with Manager() as manager:
-            status_report = manager.list()
-            status_report.append([0, 0, total_size, "Verifying"])
-            err = [None]
+        status_report = [[0, 0, total_size, "Verifying"]]
+        err = [None]
+        finished = threading.Event()
 
-            def worker():
-                try:
-                    verify(
-                        filePath=file_path,
-                        fixPadding=False,
-                        raiseVerificationException=True,
-                        originalFilePath=None,
-                        statusReportInfo=[status_report, 0],
-                    )
-                except Exception as e:
-                    err[0] = e
+        def worker():
+            try:
+                nsz_verify(
+                    file_path,
+                    False,
+                    True,
+                    True,
+                    originalFilePath=None,
+                    statusReportInfo=[status_report, 0],
+                )
+            except Exception as e:
+                err[0] = e
+            finally:
+                finished.set()
 
-            t = threading.Thread(target=worker)
-            t.start()
-            while t.is_alive():
-                if len(status_report) > 0:
-                    try:
-                        on_progress(status_report[0][0], total_size)
-                    except:
-                        pass
-                time.sleep(0.1)
-            t.join()
-            if err[0]:
-                return False, str(err[0])
+        t = threading.Thread(target=worker)
+        t.start()
+        last = -1
+        while not finished.wait(0.1):
+            if len(status_report) > 0:
+                try:
+                    read = status_report[0][0]
+                    if read != last:
+                        last = read
+                        on_progress(read, total_size)
+                except:
+                    pass
+        t.join()
+        if err[0]:
+            return False, VerifyService.error_message(str(err[0]))
         return True, ""
@@ -3,7 +3,6 @@ import shutil
 import zipfile
 import subprocess
 import asyncio
-import time
 from typing import Callable, Optional, Tuple, List
 from types import ModuleType
 
@@ -13,6 +12,7 @@ from tools.shared.utils import (
     ensure_bins,
     ensure_python_modules,
     find_archives,
+    invalidate_find_cache,
 )
 from server.services.sse_service import sse_service
 
@@ -25,7 +25,10 @@ def _load_extraction_deps() -> Tuple[ModuleType, ModuleType]:
     """Lazy-load extraction dependencies."""
     global _py7zr, _rarfile
     if _py7zr is None:
-        ensure_bins({"7z": "p7zip-full", "unrar": "unrar", "unzip": "unzip"})
+        # Queue the apt packages so they install in the same flush as pip
+        ensure_bins(
+            {"7z": "p7zip-full", "unrar": "unrar", "unzip": "unzip"}, defer=True
+        )
         ensure_python_modules(["py7zr", "rarfile"])
         import py7zr
         import rarfile
@@ -34,6 +37,14 @@ def _load_extraction_deps() -> Tuple[ModuleType, ModuleType]:
     return _py7zr, _rarfile  # type: ignore
 
 
+def _size_or_zero(path: str) -> int:
+    """Size of path with a single stat() call, 0 if it does not exist yet."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
 class ExtractService:
     @staticmethod
     async def run_extraction(job_id: str, archive_path: str):
@@ -43,12 +54,11 @@ class ExtractService:
             await sse_service.create_job(job_id)
 
             ext = os.path.splitext(archive_path)[1].lower()
-            name = os.path.splitext(os.path.basename(archive_path))[0]
+            archive_name = os.path.basename(archive_path)
+            name = os.path.splitext(archive_name)[0]
             out_dir = os.path.join(config.temp_dir, name)
             drive_dest = os.path.join(config.switch_dir, name)
-            local_archive = os.path.join(
-                config.temp_dir, os.path.basename(archive_path)
-            )
+            local_archive = os.path.join(config.temp_dir, archive_name)
             is_zip = ext == ".zip"
 
             shutil.rmtree(config.temp_dir, ignore_errors=True)
@@ -79,9 +89,7 @@ class ExtractService:
                 def do_copy():
                     def _prog(d: int, t: int):
                         asyncio.run_coroutine_threadsafe(
-                            on_progress(
-                                d, t, os.path.basename(archive_path), "[1/3] Copying"
-                            ),
+                            on_progress(d, t, archive_name, "[1/3] Copying"),
                             loop,
                         )
 
@@ -160,9 +168,11 @@ class ExtractService:
 
             await sse_service.send_event(job_id, "log", {"message": "Upload complete."})
 
-            # Cleanup
-            if os.path.exists(archive_path):
+            # Cleanup; one Drive round-trip rather than exists + remove
+            try:
                 os.remove(archive_path)
+            except FileNotFoundError:
+                pass
             shutil.rmtree(config.temp_dir, ignore_errors=True)
 
             await sse_service.send_event(
@@ -171,6 +181,9 @@ class ExtractService:
 
         except Exception as e:
             await sse_service.send_event(job_id, "error", {"message": str(e)})
+        finally:
+            # The upload may have added files under Drive, even if it failed
+            invalidate_find_cache()
 
     @staticmethod
     def _extract(archive: str, out_dir: str, on_prog: Callable[[int, int, str], None]):
@@ -196,16 +209,22 @@ class ExtractService:
                     if not i.is_directory
                 ]
             total = sum(s for _, s in items)
+            targets = [(os.path.join(out_dir, fn), sz) for fn, sz in items]
             cmd = ["7z", "x", "-aoa", "-bso0", "-bsp0", f"-o{out_dir}", archive]
             proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            while proc.poll() is None:
-                done = sum(
-                    min(os.path.getsize(p), sz)
-                    for fn, sz in items
-                    if os.path.exists(p := os.path.join(out_dir, fn))
-                )
-                on_prog(done, total, os.path.basename(archive))
-                time.sleep(0.1)
+            name = os.path.basename(archive)
+            last = -1
+            while True:
+                done = sum(min(_size_or_zero(p), sz) for p, sz in targets)
+                if done != last:
+                    last = done
+                    on_prog(done, total, name)
+                try:
+                    # Returns as soon as 7z exits instead of sleeping a full tick
+                    proc.wait(timeout=0.1)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
             if proc.returncode != 0:
                 _, err = proc.communicate()
                 raise RuntimeError(err.decode("utf-8", "ignore").strip() or "7z failed")
@@ -231,13 +250,27 @@ class ExtractService:
         src_root: str, dst_root: str, on_prog: Callable[[int, int, str], None]
     ):
         items: List[Tuple[str, str, int]] = []
-        for r, _, files in os.walk(src_root):
-            rel = os.path.relpath(r, src_root)
-            for f in files:
-                src = os.path.join(r, f)
-                items.append(
-                    (src, os.path.join(dst_root, rel, f), os.path.getsize(src))
-                )
+        if hasattr(os, "fwalk"):
+            # fwalk keeps each directory open, so sizes come from a stat
+            # relative to its fd instead of resolving the full path again
+            for r, _, files, dirfd in os.fwalk(src_root):
+                rel = os.path.relpath(r, src_root)
+                for f in files:
+                    items.append(
+                        (
+                            os.path.join(r, f),
+                            os.path.join(dst_root, rel, f),
+                            os.stat(f, dir_fd=dirfd).st_size,
+                        )
+                    )
+        else:
+            for r, _, files in os.walk(src_root):
+                rel = os.path.relpath(r, src_root)
+                for f in files:
+                    src = os.path.join(r, f)
+                    items.append(
+                        (src, os.path.join(dst_root, rel, f), os.path.getsize(src))
+                    )
         total, done = sum(s for *_, s in items), 0
         for src, dst, sz in items:
             fname = os.path.basename(src)
@@ -1,22 +1,90 @@
+import json
 import os
-from typing import List, Dict, Optional, Set
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
+from config import config
 from tools.shared.utils import fmt_bytes, find_archives, find_games
 
+# Directory listings cached as path -> (dir mtime_ns, fetched_at, items).
+# Bounded LRU; entries older than the TTL are served immediately and
+# refreshed in the background (stale-while-revalidate).
+_LISTING_CACHE_SIZE = 1024
+_LISTING_TTL = 30.0
+_listing_cache: "OrderedDict[str, Tuple[int, float, List[Dict]]]" = OrderedDict()
+_listing_lock = threading.Lock()
+_refreshing: Set[str] = set()
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="listing")
+
+# The most recent listings are also persisted so a new session can serve
+# them without rescanning. They load as stale when the module is imported,
+# so the first hit still triggers a background revalidation.
+_PERSIST_FILE = "listings.json"
+_PERSIST_DELAY = 5.0
+_PERSIST_MAX = 256
+_persist_timer: Optional[threading.Timer] = None
+
+# Stat calls on the Drive mount are dominated by round-trip latency, so large
+# directories fan them out over a shared pool to overlap the waits.
+_STAT_PARALLEL_MIN = 64
+_stat_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="stat")
+
 
 class FileService:
     @staticmethod
-    def list_directory(path: str) -> List[Dict]:
+    def list_directory(path: str, use_cache: bool = True) -> List[Dict]:
         """List files and directories in the given path."""
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Path not found: {path}")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Path not found: {path}") from None
 
-        if not os.path.isdir(path):
+        if not stat.S_ISDIR(st.st_mode):
             raise NotADirectoryError(f"Path is not a directory: {path}")
 
+        if use_cache:
+            hit = None
+            with _listing_lock:
+                cached = _listing_cache.get(path)
+                if cached is not None and cached[0] == st.st_mtime_ns:
+                    _listing_cache.move_to_end(path)
+                    if (
+                        time.monotonic() - cached[1] > _LISTING_TTL
+                        and path not in _refreshing
+                    ):
+                        _refreshing.add(path)
+                        _refresh_pool.submit(FileService._refresh_listing, path)
+                    hit = cached[2]
+            # Cached item lists are replaced, never mutated, so the copy for
+            # the caller can be made after the lock is released
+            if hit is not None:
+                return list(hit)
+
+        items, complete = FileService._scan_directory(path)
+        if complete:
+            FileService._store_listing(path, st.st_mtime_ns, items)
+        return list(items)
+
+    @staticmethod
+    def _scan_directory(path: str) -> Tuple[List[Dict], bool]:
+        """Scan path, returning its items and whether the scan was complete.
+
+        An incomplete listing is still shown, but must not be cached: it
+        would be served until the directory's mtime changes.
+        """
         items = []
+        complete = True
         try:
-            for entry in os.scandir(path):
-                stats = entry.stat()
+            with os.scandir(path) as it:
+                entries = list(it)
+            if len(entries) >= _STAT_PARALLEL_MIN:
+                stats_list = _stat_pool.map(os.DirEntry.stat, entries)
+            else:
+                stats_list = map(os.DirEntry.stat, entries)
+            for entry, stats in zip(entries, stats_list):
                 is_dir = entry.is_dir()
                 items.append(
                     {
@@ -30,18 +98,98 @@ class FileService:
                 )
         except PermissionError:
             # Handle cases where we don't have permission to list the directory
-            pass
+            complete = False
 
         # Sort: directories first, then files, both alphabetically
         items.sort(key=lambda x: (not x["is_dir"], x["name"].lower()))
-        return items
+        return items, complete
+
+    @staticmethod
+    def _store_listing(path: str, mtime_ns: int, items: List[Dict]) -> None:
+        with _listing_lock:
+            _listing_cache[path] = (mtime_ns, time.monotonic(), items)
+            _listing_cache.move_to_end(path)
+            while len(_listing_cache) > _LISTING_CACHE_SIZE:
+                _listing_cache.popitem(last=False)
+            _schedule_persist()
+
+    @staticmethod
+    def _refresh_listing(path: str) -> None:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            items, complete = FileService._scan_directory(path)
+            # An incomplete scan keeps the previous entry for the next retry
+            if complete:
+                FileService._store_listing(path, mtime_ns, items)
+        except OSError:
+            with _listing_lock:
+                _listing_cache.pop(path, None)
+        finally:
+            with _listing_lock:
+                _refreshing.discard(path)
 
     @staticmethod
-    def search_files(root: str, file_type: str) -> List[str]:
+    def search_files(root: str, file_type: str, use_cache: bool = True) -> List[str]:
         """Search for files of a specific type (archives, games)."""
         if file_type == "archives":
-            return find_archives(root)
+            return find_archives(root, use_cache=use_cache)
         elif file_type == "games":
-            return find_games(root)
+            return find_games(root, use_cache=use_cache)
         else:
             raise ValueError(f"Invalid file type: {file_type}")
+
+
+def _persist_path() -> str:
+    return os.path.join(config.cache_dir, _PERSIST_FILE)
+
+
+def _load_persisted() -> None:
+    """Seed the listing cache from disk."""
+    try:
+        with open(_persist_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # Saved oldest-first; walk backwards so LRU order survives the reload
+        entries = [(p, int(m), list(i)) for p, (m, i) in reversed(data.items())]
+    except (OSError, ValueError, TypeError, AttributeError):
+        return
+    with _listing_lock:
+        for path, mtime_ns, items in entries:
+            if path not in _listing_cache:
+                # fetched_at of 0 marks the entry stale so it gets revalidated
+                _listing_cache[path] = (mtime_ns, 0.0, items)
+                _listing_cache.move_to_end(path, last=False)
+        while len(_listing_cache) > _LISTING_CACHE_SIZE:
+            _listing_cache.popitem(last=False)
+
+
+def _schedule_persist() -> None:
+    """Coalesce writes into one save shortly after the last store.
+
+    Caller must hold _listing_lock.
+    """
+    global _persist_timer
+    if _persist_timer is None:
+        _persist_timer = threading.Timer(_PERSIST_DELAY, _save_persisted)
+        _persist_timer.daemon = True
+        _persist_timer.start()
+
+
+def _save_persisted() -> None:
+    global _persist_timer
+    with _listing_lock:
+        _persist_timer = None
+        # Only the most recently used entries, which keeps each save small
+        entries = list(_listing_cache.items())[-_PERSIST_MAX:]
+    snapshot = {path: [mtime_ns, items] for path, (mtime_ns, _, items) in entries}
+    target = _persist_path()
+    tmp = f"{target}.tmp"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, target)
+    except OSError:
+        pass
+
+
+_load_persisted()
@@ -1,14 +1,13 @@
 import os
 import json
 import re
-import shutil
 import time
 import asyncio
 import requests
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from config import config
-from tools.shared.utils import ensure_python_modules
+from tools.shared.utils import ensure_python_modules, invalidate_find_cache, stage_keys
 from server.services.sse_service import sse_service
 
 TITLEDB_URL = "https://raw.githubusercontent.com/blawar/titledb/master/US.en.json"
@@ -25,7 +24,7 @@ class OrganizeService:
 
             # Step 1: Stage keys
             await sse_service.send_event(job_id, "log", {"message": "Staging keys..."})
-            ok, key_path = OrganizeService._stage_keys()
+            ok, key_path = stage_keys()
 
             # Load keys
             from nsz.nut import Keys
@@ -47,6 +46,7 @@ class OrganizeService:
             total = len(files)
 
             for i, path in enumerate(files, 1):
+                old_name = os.path.basename(path)
                 await sse_service.send_event(
                     job_id,
                     "progress",
@@ -55,7 +55,7 @@ class OrganizeService:
                         "current": i,
                         "total": total,
                         "percent": round(i / total * 100, 2),
-                        "message": os.path.basename(path),
+                        "message": old_name,
                     },
                 )
 
@@ -75,7 +75,7 @@ class OrganizeService:
                                 {
                                     "old": path,
                                     "new": new_path,
-                                    "old_name": os.path.basename(path),
+                                    "old_name": old_name,
                                     "new_name": new_name,
                                 }
                             )
@@ -84,16 +84,14 @@ class OrganizeService:
                             job_id,
                             "log",
                             {
-                                "message": f"Skipping {os.path.basename(path)}: TitleID {tid} not in DB"
+                                "message": f"Skipping {old_name}: TitleID {tid} not in DB"
                             },
                         )
                 else:
                     await sse_service.send_event(
                         job_id,
                         "log",
-                        {
-                            "message": f"Skipping {os.path.basename(path)}: Could not identify"
-                        },
+                        {"message": f"Skipping {old_name}: Could not identify"},
                     )
 
             if not plan:
@@ -156,6 +154,7 @@ class OrganizeService:
                 )
                 fail += 1
 
+        invalidate_find_cache()
         asyncio.run_coroutine_threadsafe(
             sse_service.send_event(
                 job_id,
@@ -170,17 +169,6 @@ class OrganizeService:
         name = re.sub(r'[<>:"/\\|?*]', "-", name)
         return name.strip()
 
-    @staticmethod
-    def _stage_keys() -> Tuple[bool, str]:
-        os.makedirs(config.local_keys_dir, exist_ok=True)
-        key_files = ["prod.keys", "title.keys", "keys.txt"]
-        for name in key_files:
-            src = os.path.join(config.keys_dir, name)
-            if os.path.exists(src):
-                shutil.copy2(src, os.path.join(config.local_keys_dir, name))
-        prod = os.path.join(config.local_keys_dir, "prod.keys")
-        return os.path.isfile(prod) and os.path.getsize(prod) > 0, prod
-
     @staticmethod
     def _download_titledb(job_id: str) -> Dict[str, str]:
         cache_path = Path(config.temp_dir) / "titledb.json"
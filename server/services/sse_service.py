@@ -17,11 +17,10 @@ class StreamService:
 
     async def send_event(self, job_id: str, event_type: str, data: Any):
         """Send an event to a specific job's queue and any connected WebSockets."""
-        payload = {"event": event_type, "data": json.dumps(data)}
-
-        # Send to SSE queue
-        if job_id in self.jobs:
-            await self.jobs[job_id].put(payload)
+        # Send to SSE queue (only serialize when there is a queue to feed)
+        queue = self.jobs.get(job_id)
+        if queue is not None:
+            await queue.put({"event": event_type, "data": json.dumps(data)})
 
         # Send to WebSockets
         if job_id in self.ws_connections:
@@ -21,10 +21,23 @@ export const toolsApi = {
     list: () => request('/tools'),
 };
 
+// The file config is fixed for the life of the server, so every file
+// selector mount after the first (e.g. starting a new session once a job
+// finishes) reuses the same response. A failed request is not kept.
+let configRequest = null;
+
 export const filesApi = {
-    list: (path) => request(`/files/list?path=${encodeURIComponent(path)}`),
+    list: (path, fresh = false) => request(`/files/list?path=${encodeURIComponent(path)}${fresh ? '&fresh=true' : ''}`),
     search: (root, type) => request(`/files/search?root=${encodeURIComponent(root)}&type=${type}`),
-    getConfig: () => request('/files/config'),
+    getConfig: () => {
+        if (!configRequest) {
+            configRequest = request('/files/config').catch(err => {
+                configRequest = null;
+                throw err;
+            });
+        }
+        return configRequest;
+    },
 };
 
 export const extractApi = {
@@ -1,6 +1,57 @@
-import { html, useState, useEffect, useRef } from '../lib.js';
+import { html, Component, useState, useEffect, useRef, useMemo, useCallback } from '../lib.js';
 import { filesApi } from '../api.js';
 
+// Rows only re-render when their own item or selection state changes,
+// so toggling one checkbox doesn't rebuild the whole listing.
+class FileRow extends Component {
+  shouldComponentUpdate(next) {
+    const p = this.props;
+    return next.item !== p.item || next.isSelected !== p.isSelected
+      || next.index !== p.index || next.multi !== p.multi;
+  }
+
+  render({ item, index, multi, isSelected, onClick }) {
+    return html`
+      <div 
+        data-index=${index}
+        class="flex items-center px-4 py-2 hover:bg-slate-700/50 transition-colors cursor-pointer ${isSelected ? 'bg-sky-900/20' : ''}"
+        onClick=${onClick}
+      >
+        <div class="mr-3">
+          ${item.is_dir ? html`
+            <div key="dir-icon"><i data-lucide="folder" class="w-5 h-5 text-amber-400"></i></div>
+          ` : (
+            multi ? html`
+              <div class="w-5 h-5 flex items-center justify-center" key=${isSelected ? 'checked' : 'unchecked'}>
+                <i data-lucide="${isSelected ? 'check-square' : 'square'}" class="w-5 h-5 ${isSelected ? 'text-sky-500' : 'text-slate-600'}"></i>
+              </div>
+            ` : html`
+              <div class="w-5 h-5 flex items-center justify-center" key="file-icon">
+                <i data-lucide="file" class="w-5 h-5 text-slate-400"></i>
+              </div>
+            `
+          )}
+        </div>
+      
+        <div class="flex-1 min-w-0">
+          <div class="text-sm truncate ${isSelected ? 'text-sky-300 font-medium' : 'text-slate-200'}">
+            ${item.name}
+          </div>
+          ${item.size_str ? html`
+            <div class="text-[10px] text-slate-500">${item.size_str}</div>
+          ` : ''}
+        </div>
+
+        ${!item.is_dir && !multi && isSelected ? html`
+          <div class="w-5 h-5 flex items-center justify-center" key="check-icon">
+            <i data-lucide="check" class="w-4 h-4 text-sky-500"></i>
+          </div>
+        ` : html`<div class="w-5 h-5" key="empty-icon"></div>`}
+      </div>
+    `;
+  }
+}
+
 export default function FileSelector({ onSelect, multi = false, filter }) {
   const [currentPath, setCurrentPath] = useState('');
   const [items, setItems] = useState([]);
@@ -8,6 +59,10 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
   const [loading, setLoading] = useState(false);
   const [refreshKey, setRefreshKey] = useState(0);
   const [config, setConfig] = useState(null);
+  const forceRefresh = useRef(false);
+  const [query, setQuery] = useState('');
+  const [search, setSearch] = useState('');
+  const lastFilter = useRef({ items: null, term: '', result: [] });
 
   useEffect(() => {
     filesApi.getConfig().then(data => {
@@ -20,9 +75,13 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
   useEffect(() => {
     if (currentPath) {
       setLoading(true);
-      filesApi.list(currentPath)
+      const fresh = forceRefresh.current;
+      forceRefresh.current = false;
+      filesApi.list(currentPath, fresh)
         .then(data => {
-          setItems(filter ? data.filter(filter) : data);
+          const listed = filter ? data.filter(filter) : data;
+          // Lowercase once per listing so filtering doesn't redo it per keystroke
+          setItems(listed.map(item => ({ ...item, lowerName: item.name.toLowerCase() })));
           setLoading(false);
         })
         .catch(err => {
@@ -32,11 +91,38 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
     }
   }, [currentPath, filter, refreshKey]);
 
+  useEffect(() => {
+    setQuery('');
+    setSearch('');
+  }, [currentPath]);
+
+  // Debounce typing so a burst of keystrokes filters the list only once
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(query), 150);
+    return () => clearTimeout(timer);
+  }, [query]);
+
+  // When the new term extends the previous one, only the previous matches
+  // can still match, so narrow those instead of rescanning every item.
+  const visibleItems = useMemo(() => {
+    const term = search.trim().toLowerCase();
+    const prev = lastFilter.current;
+    let result = items;
+    if (term) {
+      const source = prev.items === items && prev.term && term.startsWith(prev.term)
+        ? prev.result
+        : items;
+      result = source.filter(item => item.lowerName.includes(term));
+    }
+    lastFilter.current = { items, term, result };
+    return result;
+  }, [items, search]);
+
   useEffect(() => {
     if (typeof lucide !== 'undefined') {
         lucide.createIcons();
     }
-  }, [items, loading, Array.from(selected).join(',')]);
+  }, [visibleItems, loading, selected]);
 
   const toggleSelect = (path) => {
     const newSelected = new Set(selected);
@@ -53,10 +139,32 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
   };
 
 
+  // Single click handler shared by every row; the row index is read back
+  // from the element instead of capturing a closure per item.
+  const onItemClick = (e) => {
+    const item = visibleItems[e.currentTarget.dataset.index];
+    if (!item) return;
+    if (item.is_dir) {
+      setCurrentPath(item.path);
+    } else {
+      toggleSelect(item.path);
+    }
+  };
+
+  // Stable identity so memoized rows never hold a stale handler
+  const clickRef = useRef(onItemClick);
+  clickRef.current = onItemClick;
+  const handleItemClick = useCallback((e) => clickRef.current(e), []);
+
+  // Derived once per listing/filter change rather than on every click
+  const visibleFilePaths = useMemo(
+    () => visibleItems.filter(i => !i.is_dir).map(i => i.path),
+    [visibleItems]
+  );
+
   const selectAll = () => {
-    const filesOnly = items.filter(i => !i.is_dir).map(i => i.path);
-    setSelected(new Set(filesOnly));
-    onSelect(filesOnly);
+    setSelected(new Set(visibleFilePaths));
+    onSelect(visibleFilePaths.slice());
   };
 
   const selectNone = () => {
@@ -83,7 +191,10 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
           </button>
           
           <button 
-            onClick=${() => setRefreshKey(k => k + 1)}
+            onClick=${() => {
+              forceRefresh.current = true;
+              setRefreshKey(k => k + 1);
+            }}
             class="p-1 hover:bg-slate-700 rounded transition-colors text-slate-400 hover:text-white"
             title="Refresh"
           >
@@ -103,6 +214,16 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
         ` : ''}
       </div>
 
+      <div class="px-4 py-2 border-b border-slate-700">
+        <input
+          type="text"
+          value=${query}
+          onInput=${(e) => setQuery(e.target.value)}
+          placeholder="Filter by name..."
+          class="w-full bg-slate-900/50 border border-slate-700 rounded-lg px-3 py-1.5 text-xs text-slate-200 placeholder-slate-500 focus:outline-none focus:border-sky-500"
+        />
+      </div>
+
       <div class="flex-1 overflow-y-auto min-h-[200px]">
         ${loading ? html`
           <div key="loader" class="h-full flex flex-col items-center justify-center py-10">
@@ -114,7 +235,7 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
           </div>
         ` : html`
           <div class="divide-y divide-slate-700/50">
-            ${items.length === 0 ? html`
+            ${visibleItems.length === 0 ? html`
               <div class="p-12 text-center">
                 <div class="inline-flex p-4 rounded-full bg-slate-700/30 mb-4">
                   <div key="empty-folder-icon"><i data-lucide="folder-open" class="w-8 h-8 text-slate-500"></i></div>
@@ -122,43 +243,15 @@ export default function FileSelector({ onSelect, multi = false, filter }) {
                 <p class="text-slate-400 font-medium">No supported files found here</p>
                 <p class="text-slate-500 text-xs mt-1">Try navigating to another folder</p>
               </div>
-            ` : items.map(item => html`
-              <div 
+            ` : visibleItems.map((item, i) => html`
+              <${FileRow}
                 key=${item.path}
-                class="flex items-center px-4 py-2 hover:bg-slate-700/50 transition-colors cursor-pointer ${selected.has(item.path) ? 'bg-sky-900/20' : ''}"
-                onClick=${() => item.is_dir ? setCurrentPath(item.path) : toggleSelect(item.path)}
-              >
-                <div class="mr-3">
-                  ${item.is_dir ? html`
-                    <div key="dir-icon"><i data-lucide="folder" class="w-5 h-5 text-amber-400"></i></div>
-                  ` : (
-                    multi ? html`
-                      <div class="w-5 h-5 flex items-center justify-center" key=${selected.has(item.path) ? 'checked' : 'unchecked'}>
-                        <i data-lucide="${selected.has(item.path) ? 'check-square' : 'square'}" class="w-5 h-5 ${selected.has(item.path) ? 'text-sky-500' : 'text-slate-600'}"></i>
-                      </div>
-                    ` : html`
-                      <div class="w-5 h-5 flex items-center justify-center" key="file-icon">
-                        <i data-lucide="file" class="w-5 h-5 text-slate-400"></i>
-                      </div>
-                    `
-                  )}
-                </div>
-                
-                <div class="flex-1 min-w-0">
-                  <div class="text-sm truncate ${selected.has(item.path) ? 'text-sky-300 font-medium' : 'text-slate-200'}">
-                    ${item.name}
-                  </div>
-                  ${item.size_str ? html`
-                    <div class="text-[10px] text-slate-500">${item.size_str}</div>
-                  ` : ''}
-                </div>
-
-                ${!item.is_dir && !multi && selected.has(item.path) ? html`
-                  <div class="w-5 h-5 flex items-center justify-center" key="check-icon">
-                    <i data-lucide="check" class="w-4 h-4 text-sky-500"></i>
-                  </div>
-                ` : html`<div class="w-5 h-5" key="empty-icon"></div>`}
-              </div>
+                item=${item}
+                index=${i}
+                multi=${multi}
+                isSelected=${selected.has(item.path)}
+                onClick=${handleItemClick}
+              />
             `)}
           </div>
         `}
@@ -1,5 +1,25 @@
 import { html, useEffect, useRef } from '../lib.js';
 
+// Log entries are immutable once queued, so each one's colour class is
+// worked out on its first render and reused for every later re-render.
+const classCache = new WeakMap();
+
+const classify = (msg) => {
+  if (msg.includes('FAIL') || msg.includes('Error') || msg.includes('failed')) return 'text-rose-400';
+  if (msg.includes('OK') || msg.includes('success') || msg.includes('Done')) return 'text-emerald-400';
+  return 'text-slate-300';
+};
+
+const lineClass = (log, msg) => {
+  if (typeof log === 'string') return classify(msg);
+  let cls = classCache.get(log);
+  if (cls === undefined) {
+    cls = classify(msg);
+    classCache.set(log, cls);
+  }
+  return cls;
+};
+
 export default function LogOutput({ logs }) {
   const scrollRef = useRef(null);
 
@@ -23,14 +43,11 @@ export default function LogOutput({ logs }) {
         ` : logs.map((log, i) => {
             const msg = typeof log === 'string' ? log : log.message;
             const time = typeof log === 'string' ? new Date().toLocaleTimeString() : log.time;
-            
-            const isError = msg.includes('FAIL') || msg.includes('Error') || msg.includes('failed');
-            const isSuccess = msg.includes('OK') || msg.includes('success') || msg.includes('Done');
-            
+
             return html`
               <div 
                 key=${i} 
-                class="${isError ? 'text-rose-400' : isSuccess ? 'text-emerald-400' : 'text-slate-300'}"
+                class=${lineClass(log, msg)}
               >
                 <span class="text-slate-600 mr-2">[${time}]</span>
                 ${msg}
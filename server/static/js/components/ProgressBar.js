@@ -19,9 +19,17 @@ const formatTime = (seconds) => {
   return `${s}s`;
 };
 
-const formatValue = (val, isBytes) => {
-  if (isBytes) return formatBytes(val);
-  return val?.toLocaleString() || '0';
+const formatCount = (val) => val?.toLocaleString() || '0';
+
+// Formatters are picked once per unit type rather than branching per value.
+const BYTE_FORMATTERS = {
+  value: formatBytes,
+  speed: (speed) => formatBytes(speed) + '/s',
+};
+
+const COUNT_FORMATTERS = {
+  value: formatCount,
+  speed: (speed) => speed.toFixed(1) + ' files/s',
 };
 
 export default function ProgressBar({ percent, step, message, total, current, startTime }) {
@@ -35,6 +43,11 @@ export default function ProgressBar({ percent, step, message, total, current, st
     const s = step?.toLowerCase() || '';
     return s.includes('copy') || s.includes('extract') || s.includes('compress') || s.includes('upload') || total > 1000000;
   }, [step, total]);
+  const fmt = isBytes ? BYTE_FORMATTERS : COUNT_FORMATTERS;
+
+  // The total rarely changes within a step, while the bar re-renders on
+  // every progress event and elapsed tick; format it only when it moves.
+  const totalText = useMemo(() => fmt.value(total), [fmt, total]);
 
   // Reset step timer and samples when step changes
   if (step !== lastStep) {
@@ -92,7 +105,7 @@ export default function ProgressBar({ percent, step, message, total, current, st
         <div class="flex flex-col">
           <span class="text-sm font-medium text-sky-400">${step || 'Processing...'}</span>
           <span class="text-[10px] text-slate-500 font-mono mt-1">
-            Runtime: ${formatTime(elapsed)} ${speed > 0 ? html`• Speed: ${isBytes ? formatBytes(speed) + '/s' : speed.toFixed(1) + ' files/s'}` : ''}
+            Runtime: ${formatTime(elapsed)} ${speed > 0 ? html`• Speed: ${fmt.speed(speed)}` : ''}
           </span>
         </div>
         <div class="flex flex-col items-end">
@@ -114,7 +127,7 @@ export default function ProgressBar({ percent, step, message, total, current, st
         </div>
         ${total && total > 0 ? html`
           <div class="text-xs font-mono text-slate-500 whitespace-nowrap">
-            ${formatValue(current, isBytes)} / ${formatValue(total, isBytes)}
+            ${fmt.value(current)} / ${totalText}
           </div>
         ` : ''}
       </div>
@@ -1,5 +1,39 @@
 import { useState, useEffect, useCallback, useRef } from './lib.js';
 
+// Keep only the most recent log lines so long jobs don't grow the log
+// (and its render cost) without bound.
+const MAX_LOG_LINES = 500;
+
+// Log lines arriving in a burst are flushed to state together, at most
+// once per interval, instead of re-rendering once per line.
+const LOG_FLUSH_MS = 100;
+
+// Progress events are merged and applied at most once per interval, so a
+// burst of updates (copy callbacks, batch results) renders only the latest.
+const PROGRESS_FLUSH_MS = 100;
+
+// Formatting a locale time string is comparatively slow; lines logged within
+// the same second share one formatted stamp.
+let stampSecond = -1;
+let stampText = '';
+
+const logTimestamp = () => {
+  const now = Date.now();
+  const second = Math.floor(now / 1000);
+  if (second !== stampSecond) {
+    stampSecond = second;
+    stampText = new Date(now).toLocaleTimeString();
+  }
+  return stampText;
+};
+
+// Trim before joining so each flush copies at most MAX_LOG_LINES entries once
+const appendLogs = (prev, entries) => {
+  if (entries.length >= MAX_LOG_LINES) return entries.slice(entries.length - MAX_LOG_LINES);
+  const keep = MAX_LOG_LINES - entries.length;
+  return (prev.length > keep ? prev.slice(prev.length - keep) : prev).concat(entries);
+};
+
 export function useSSE(jobId, tool) {
   const [progress, setProgress] = useState(null);
   const [logs, setLogs] = useState([]);
@@ -9,6 +43,10 @@ export function useSSE(jobId, tool) {
   const [startTime, setStartTime] = useState(null);
   const socketRef = useRef(null);
   const audioRef = useRef(null);
+  const pendingLogs = useRef([]);
+  const flushTimer = useRef(null);
+  const pendingProgress = useRef(null);
+  const progressTimer = useRef(null);
 
   useEffect(() => {
     // Pre-load audio to "unlock" it for background playback
@@ -16,7 +54,35 @@ export function useSSE(jobId, tool) {
     audioRef.current.load();
   }, []);
 
+  const queueLog = useCallback((message) => {
+    pendingLogs.current.push({ message, time: logTimestamp() });
+    if (flushTimer.current !== null) return;
+    flushTimer.current = setTimeout(() => {
+      flushTimer.current = null;
+      const batch = pendingLogs.current;
+      pendingLogs.current = [];
+      setLogs(prev => appendLogs(prev, batch));
+    }, LOG_FLUSH_MS);
+  }, []);
+
+  const queueProgress = useCallback((data) => {
+    pendingProgress.current = Object.assign(pendingProgress.current || {}, data);
+    if (progressTimer.current !== null) return;
+    progressTimer.current = setTimeout(() => {
+      progressTimer.current = null;
+      const update = pendingProgress.current;
+      pendingProgress.current = null;
+      setProgress(prev => ({ ...prev, ...update }));
+    }, PROGRESS_FLUSH_MS);
+  }, []);
+
   const reset = useCallback(() => {
+    clearTimeout(flushTimer.current);
+    flushTimer.current = null;
+    pendingLogs.current = [];
+    clearTimeout(progressTimer.current);
+    progressTimer.current = null;
+    pendingProgress.current = null;
     setProgress(null);
     setLogs([]);
     setIsComplete(false);
@@ -56,22 +122,16 @@ export function useSSE(jobId, tool) {
       
       switch (msg.type) {
         case 'progress':
-          setProgress(prev => ({ ...prev, ...msg.data }));
+          queueProgress(msg.data);
           break;
         case 'log':
-          setLogs(prev => [...prev, { 
-            message: msg.data.message, 
-            time: new Date().toLocaleTimeString() 
-          }]);
+          queueLog(msg.data.message);
           break;
         case 'confirm_request':
           setConfirmRequest(msg.data);
           break;
         case 'complete':
-          setLogs(prev => [...prev, { 
-            message: msg.data.message || 'Operation complete.', 
-            time: new Date().toLocaleTimeString() 
-          }]);
+          queueLog(msg.data.message || 'Operation complete.');
           setIsComplete(true);
           
           // Play success sound using pre-loaded reference
@@ -101,7 +161,12 @@ export function useSSE(jobId, tool) {
     return () => {
       socket.close();
     };
-  }, [jobId, tool, reset]);
+  }, [jobId, tool, reset, queueLog, queueProgress]);
+
+  useEffect(() => () => {
+    clearTimeout(flushTimer.current);
+    clearTimeout(progressTimer.current);
+  }, []);
 
   return { progress, logs, isComplete, error, confirmRequest, startTime, confirm, reset };
 }
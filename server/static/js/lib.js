@@ -1,4 +1,4 @@
-import { h, render } from 'https://esm.sh/preact@10.19.2';
+import { h, render, Component } from 'https://esm.sh/preact@10.19.2';
 import { useState, useEffect, useCallback, useRef, useMemo } from 'https://esm.sh/preact@10.19.2/hooks';
 import htm from 'https://esm.sh/htm@3.1.1';
 
@@ -8,6 +8,7 @@ const html = htm.bind(h);
 export {
     html,
     render,
+    Component,
     useState,
     useEffect,
     useCallback,
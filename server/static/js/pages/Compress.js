@@ -12,9 +12,11 @@ export default function Compress() {
   const [jobId, setJobId] = useState(null);
   const { progress, logs, isComplete, error, confirmRequest, startTime, confirm, reset } = useSSE(jobId, 'compress');
 
-  const filter = useMemo(() => (f) => 
-    f.is_dir || [ '.nsp', '.xci' ].some(ext => f.name.toLowerCase().endsWith(ext)), 
-  []);
+  const filter = useMemo(() => (f) => {
+    if (f.is_dir) return true;
+    const name = f.name.toLowerCase();
+    return [ '.nsp', '.xci' ].some(ext => name.endsWith(ext));
+  }, []);
 
   useEffect(() => {
     if (typeof lucide !== 'undefined') {
@@ -118,45 +120,43 @@ export default function Compress() {
             />
           ` : ''}
 
-          ${confirmRequest ? html`
-            <div key="confirm-panel" class="bg-amber-500/10 border border-amber-500/20 rounded-2xl p-6 shadow-xl animate-slide-up">
-              <div class="flex items-center space-x-3 text-amber-400 mb-4">
-                <div key="confirm-icon"><i data-lucide="help-circle" class="w-6 h-6"></i></div>
-                <h3 class="text-xl font-bold">Confirm Compression</h3>
+          <div key="confirm-panel" class="${confirmRequest ? 'animate-slide-up' : 'hidden'} bg-amber-500/10 border border-amber-500/20 rounded-2xl p-6 shadow-xl">
+            <div class="flex items-center space-x-3 text-amber-400 mb-4">
+              <div key="confirm-icon"><i data-lucide="help-circle" class="w-6 h-6"></i></div>
+              <h3 class="text-xl font-bold">Confirm Compression</h3>
+            </div>
+            
+            <div class="grid grid-cols-2 gap-4 mb-6">
+              <div class="bg-slate-900/50 p-4 rounded-xl">
+                <div class="text-xs text-slate-500 uppercase font-bold mb-1">Original</div>
+                <div class="text-lg font-mono text-slate-300">${confirmRequest?.original_size_str}</div>
               </div>
-              
-              <div class="grid grid-cols-2 gap-4 mb-6">
-                <div class="bg-slate-900/50 p-4 rounded-xl">
-                  <div class="text-xs text-slate-500 uppercase font-bold mb-1">Original</div>
-                  <div class="text-lg font-mono text-slate-300">${confirmRequest.original_size_str}</div>
-                </div>
-                <div class="bg-slate-900/50 p-4 rounded-xl">
-                  <div class="text-xs text-slate-500 uppercase font-bold mb-1">Compressed</div>
-                  <div class="text-lg font-mono text-emerald-400">${confirmRequest.compressed_size_str}</div>
-                </div>
+              <div class="bg-slate-900/50 p-4 rounded-xl">
+                <div class="text-xs text-slate-500 uppercase font-bold mb-1">Compressed</div>
+                <div class="text-lg font-mono text-emerald-400">${confirmRequest?.compressed_size_str}</div>
               </div>
+            </div>
 
-              <p class="text-slate-300 mb-6">
-                Compression saved <span class="text-emerald-400 font-bold">${confirmRequest.savings}</span> (${confirmRequest.percent}% of original). 
-                Keep the compressed version and delete the original?
-              </p>
+            <p class="text-slate-300 mb-6">
+              Compression saved <span class="text-emerald-400 font-bold">${confirmRequest?.savings}</span> (${confirmRequest?.percent}% of original). 
+              Keep the compressed version and delete the original?
+            </p>
 
-              <div class="flex space-x-4">
-                <button
-                  onClick=${() => handleConfirm(true)}
-                  class="flex-1 py-3 bg-emerald-600 hover:bg-emerald-500 text-white font-bold rounded-xl transition-colors shadow-lg shadow-emerald-600/20"
-                >
-                  Yes, Keep it
-                </button>
-                <button
-                  onClick=${() => handleConfirm(false)}
-                  class="flex-1 py-3 bg-slate-700 hover:bg-slate-600 text-white font-bold rounded-xl transition-colors"
-                >
-                  No, Discard
-                </button>
-              </div>
+            <div class="flex space-x-4">
+              <button
+                onClick=${() => handleConfirm(true)}
+                class="flex-1 py-3 bg-emerald-600 hover:bg-emerald-500 text-white font-bold rounded-xl transition-colors shadow-lg shadow-emerald-600/20"
+              >
+                Yes, Keep it
+              </button>
+              <button
+                onClick=${() => handleConfirm(false)}
+                class="flex-1 py-3 bg-slate-700 hover:bg-slate-600 text-white font-bold rounded-xl transition-colors"
+              >
+                No, Discard
+              </button>
             </div>
-          ` : ''}
+          </div>
 
           <${LogOutput} logs=${logs} />
 
@@ -10,9 +10,11 @@ export default function Extract() {
   const [jobId, setJobId] = useState(null);
   const { progress, logs, isComplete, error, startTime, reset } = useSSE(jobId, 'extract');
 
-  const filter = useMemo(() => (f) => 
-    f.is_dir || [ '.zip', '.7z', '.rar' ].some(ext => f.name.toLowerCase().endsWith(ext)), 
-  []);
+  const filter = useMemo(() => (f) => {
+    if (f.is_dir) return true;
+    const name = f.name.toLowerCase();
+    return [ '.zip', '.7z', '.rar' ].some(ext => name.endsWith(ext));
+  }, []);
 
   useEffect(() => {
     if (typeof lucide !== 'undefined') {
@@ -5,14 +5,42 @@ import LogOutput from '../components/LogOutput.js';
 import { organizeApi } from '../api.js';
 import { useSSE } from '../hooks.js';
 
+// Large rename plans only render their head and tail; the rest is summarised.
+const PLAN_RENDER_LIMIT = 1000;
+const PLAN_EDGE_COUNT = 500;
+
 export default function Organize() {
   const [selectedFiles, setSelectedFiles] = useState([]);
   const [jobId, setJobId] = useState(null);
   const { progress, logs, isComplete, error, confirmRequest, startTime, confirm, reset } = useSSE(jobId, 'organize');
 
-  const filter = useMemo(() => (f) => 
-    f.is_dir || [ '.nsp', '.nsz', '.xci', '.xcz' ].some(ext => f.name.toLowerCase().endsWith(ext)), 
-  []);
+  const filter = useMemo(() => (f) => {
+    if (f.is_dir) return true;
+    const name = f.name.toLowerCase();
+    return [ '.nsp', '.nsz', '.xci', '.xcz' ].some(ext => name.endsWith(ext));
+  }, []);
+
+  const planView = useMemo(() => {
+    const plan = confirmRequest?.plan || [];
+    if (plan.length <= PLAN_RENDER_LIMIT) {
+      return { head: plan, tail: [], omitted: 0 };
+    }
+    return {
+      head: plan.slice(0, PLAN_EDGE_COUNT),
+      tail: plan.slice(plan.length - PLAN_EDGE_COUNT),
+      omitted: plan.length - 2 * PLAN_EDGE_COUNT,
+    };
+  }, [confirmRequest]);
+
+  const renderPlanItem = (item, i) => html`
+    <div key=${i} class="p-4 space-y-2">
+      <div class="text-xs text-rose-400 font-mono truncate opacity-60 line-through">${item.old_name}</div>
+      <div class="flex items-center space-x-2">
+        <div key="arrow-icon-${i}"><i data-lucide="arrow-right" class="w-3.5 h-3.5 text-slate-500"></i></div>
+        <div class="text-sm text-emerald-400 font-bold truncate">${item.new_name}</div>
+      </div>
+    </div>
+  `;
 
   useEffect(() => {
     if (typeof lucide !== 'undefined') {
@@ -107,15 +135,13 @@ export default function Organize() {
               </div>
               
               <div class="max-h-96 overflow-y-auto divide-y divide-slate-700/50">
-                ${confirmRequest.plan.map((item, i) => html`
-                  <div key=${i} class="p-4 space-y-2">
-                    <div class="text-xs text-rose-400 font-mono truncate opacity-60 line-through">${item.old_name}</div>
-                    <div class="flex items-center space-x-2">
-                      <div key="arrow-icon-${i}"><i data-lucide="arrow-right" class="w-3.5 h-3.5 text-slate-500"></i></div>
-                      <div class="text-sm text-emerald-400 font-bold truncate">${item.new_name}</div>
-                    </div>
+                ${planView.head.map((item, i) => renderPlanItem(item, i))}
+                ${planView.omitted > 0 ? html`
+                  <div key="plan-omitted" class="p-4 text-center text-xs text-slate-500 italic">
+                    … ${planView.omitted} more renames omitted …
                   </div>
-                `)}
+                ` : ''}
+                ${planView.tail.map((item, i) => renderPlanItem(item, planView.head.length + planView.omitted + i))}
               </div>
 
               <div class="p-6 bg-slate-900/30 flex space-x-4">
@@ -10,9 +10,11 @@ export default function Verify() {
   const [jobId, setJobId] = useState(null);
   const { progress, logs, isComplete, error, startTime, reset } = useSSE(jobId, 'verify');
 
-  const filter = useMemo(() => (f) => 
-    f.is_dir || [ '.nsp', '.nsz', '.xci', '.xcz' ].some(ext => f.name.toLowerCase().endsWith(ext)), 
-  []);
+  const filter = useMemo(() => (f) => {
+    if (f.is_dir) return true;
+    const name = f.name.toLowerCase();
+    return [ '.nsp', '.nsz', '.xci', '.xcz' ].some(ext => name.endsWith(ext));
+  }, []);
 
   useEffect(() => {
     if (typeof lucide !== 'undefined') {
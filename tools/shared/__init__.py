@@ -15,9 +15,13 @@ from .utils import (
     find_archives,
     find_games,
     find_games_progressive,
+    flush_installs,
     fmt_bytes,
     fmt_time,
+    invalidate_find_cache,
+    iter_archives,
     short,
+    stage_keys,
 )
 
 __all__ = [
@@ -26,11 +30,15 @@ __all__ = [
     "fmt_time",
     "short",
     "find_archives",
+    "iter_archives",
     "find_games",
     "find_games_progressive",
+    "invalidate_find_cache",
     "copy_with_progress",
     "ensure_drive_ready",
     "ensure_bins",
     "ensure_python_modules",
+    "flush_installs",
+    "stage_keys",
     "ProgressCallback",
 ]
@@ -2,14 +2,35 @@
 
 from __future__ import annotations
 
+import functools
 import importlib.util
+import io
+import itertools
 import os
+import queue
 import shutil
 import subprocess
-from typing import Callable, List, Optional, Set
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from config import config
 
+# Set after the first successful check. Drive is only unmounted by a runtime
+# reset, which restarts the process, so the mount never needs re-checking.
+_drive_ready = False
+
 
 def ensure_drive_ready() -> None:
     """Check that Google Drive is mounted.
@@ -17,49 +38,145 @@ def ensure_drive_ready() -> None:
     Raises:
         RuntimeError: If Drive is not mounted.
     """
+    global _drive_ready
+    if _drive_ready:
+        return
     if not os.path.exists(config.shared_drives):
         raise RuntimeError(
             "Drive not mounted. Run the loader cell first to mount Drive."
         )
+    _drive_ready = True
+
+
+# Installs requested with defer=True are queued here and run together by
+# flush_installs(), one apt-get and one pip process for the whole batch.
+_pending_apt: Set[str] = set()
+_pending_pip: Set[str] = set()
+_MODULES_CHECKED: Set[str] = set()
+_install_lock = threading.Lock()
+
+
+# PATH lookups are memoized; the cache is dropped after every apt install so
+# newly installed binaries are picked up.
+_which = functools.lru_cache(maxsize=None)(shutil.which)
 
 
-def ensure_bins(bins_to_packages: dict[str, str]) -> None:
+def flush_installs() -> None:
+    """Run all queued apt and pip installs.
+
+    Called automatically by any ensure_bins()/ensure_python_modules() call
+    made without defer=True, so deferred requests are installed before the
+    next caller that needs its dependencies right away.
+    """
+    # Held for the whole install so concurrent callers wait for it instead
+    # of starting a second apt/pip run for the same packages.
+    with _install_lock:
+        apt = sorted(_pending_apt)
+        pip = sorted(_pending_pip)
+        _pending_apt.clear()
+        _pending_pip.clear()
+        if apt:
+            subprocess.run(
+                ["apt-get", "install", "-qq", *apt],
+                capture_output=True,
+                check=False,
+            )
+            _which.cache_clear()
+        if pip:
+            subprocess.run(
+                ["pip", "install", "-q", *pip],
+                capture_output=True,
+                check=False,
+            )
+            importlib.invalidate_caches()
+            _has_module.cache_clear()
+            _MODULES_CHECKED.update(pip)
+
+
+def ensure_bins(bins_to_packages: dict[str, str], defer: bool = False) -> None:
     """Install missing apt packages for required binaries.
 
     Args:
         bins_to_packages: Mapping of binary name to apt package name.
+        defer: Queue the install for a later flush_installs() instead of
+            running it now.
     """
-    missing = [
-        pkg for cmd, pkg in bins_to_packages.items() if shutil.which(cmd) is None
-    ]
+    missing = [pkg for cmd, pkg in bins_to_packages.items() if _which(cmd) is None]
     if missing:
-        subprocess.run(
-            ["apt-get", "install", "-qq", *missing],
-            capture_output=True,
-            check=False,
-        )
+        with _install_lock:
+            _pending_apt.update(missing)
+    if not defer and (_pending_apt or _pending_pip):
+        flush_installs()
 
 
-_MODULES_CHECKED: Set[str] = set()
+@functools.lru_cache(maxsize=None)
+def _has_module(name: str) -> bool:
+    """Whether a module is importable, without repeating the path search."""
+    return name in sys.modules or importlib.util.find_spec(name) is not None
 
 
-def ensure_python_modules(modules: List[str]) -> None:
+def ensure_python_modules(modules: List[str], defer: bool = False) -> None:
     """Install missing Python modules via pip.
 
     Args:
         modules: List of module names to ensure are installed.
+        defer: Queue the install for a later flush_installs() instead of
+            running it now.
     """
-    unchecked = [m for m in modules if m not in _MODULES_CHECKED]
-    if not unchecked:
-        return
-    missing = [m for m in unchecked if importlib.util.find_spec(m) is None]
-    if missing:
-        subprocess.run(
-            ["pip", "install", "-q", *missing],
-            capture_output=True,
-            check=False,
-        )
-    _MODULES_CHECKED.update(modules)
+    if any(m not in _MODULES_CHECKED for m in modules):
+        with _install_lock:
+            for m in modules:
+                if m in _MODULES_CHECKED:
+                    continue
+                if _has_module(m):
+                    _MODULES_CHECKED.add(m)
+                else:
+                    _pending_pip.add(m)
+    if not defer and (_pending_apt or _pending_pip):
+        flush_installs()
+
+
+KEY_FILES = ("prod.keys", "title.keys", "keys.txt")
+
+
+def stage_keys() -> Tuple[bool, str]:
+    """Copy the Switch key files from Drive to the local keys directory.
+
+    The Drive keys folder is listed once, and a key is only copied when the
+    local copy is missing, a different size, or older than the one on Drive.
+
+    Returns:
+        Tuple of (whether a non-empty prod.keys is staged, its local path).
+    """
+    os.makedirs(config.local_keys_dir, exist_ok=True)
+    try:
+        with os.scandir(config.keys_dir) as it:
+            found = [e for e in it if e.name in KEY_FILES and e.is_file()]
+    except OSError:
+        found = []
+    for entry in found:
+        dst = os.path.join(config.local_keys_dir, entry.name)
+        try:
+            local, remote = os.stat(dst), entry.stat()
+            if (
+                local.st_size == remote.st_size
+                and local.st_mtime_ns >= remote.st_mtime_ns
+            ):
+                continue
+        except FileNotFoundError:
+            pass
+        # Same large-chunk / in-kernel path as game copies; copystat keeps
+        # the Drive mtime so the next call can skip the copy
+        copy_with_progress(entry.path, dst)
+        shutil.copystat(entry.path, dst)
+    prod = os.path.join(config.local_keys_dir, "prod.keys")
+    try:
+        return os.stat(prod).st_size > 0, prod
+    except OSError:
+        return False, prod
+
+
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
 
 
 def fmt_bytes(b: float) -> str:
@@ -71,11 +188,11 @@ def fmt_bytes(b: float) -> str:
     Returns:
         Formatted string like "1.5 GB".
     """
-    for u in ["B", "KB", "MB", "GB"]:
-        if b < 1024:
-            return f"{b:.1f} {u}"
-        b /= 1024
-    return f"{b:.1f} TB"
+    if b < 1024:
+        return f"{b:.1f} B"
+    # Each unit spans 10 bits, so the bit length picks it without dividing
+    i = min(4, (int(b).bit_length() - 1) // 10)
+    return f"{b / (1 << (10 * i)):.1f} {_BYTE_UNITS[i]}"
 
 
 def fmt_time(s: float) -> str:
@@ -87,10 +204,15 @@ def fmt_time(s: float) -> str:
     Returns:
         Formatted time string like "01:23:45".
     """
-    s = int(max(0, s))
+    return _fmt_seconds(int(max(0, s)))
+
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_seconds(s: int) -> str:
+    # Progress displays ask for the same whole second many times over
     h, r = divmod(s, 3600)
     m, s = divmod(r, 60)
-    return f"{h:02d}:{m:02d}:{s:02d}"
+    return "%02d:%02d:%02d" % (h, m, s)
 
 
 def short(name: str, n: int = 55) -> str:
@@ -106,49 +228,209 @@ def short(name: str, n: int = 55) -> str:
     return name[: n - 3] + "..." if len(name) > n else name
 
 
-def find_archives(root: str, exts: Optional[Set[str]] = None) -> List[str]:
+def _endings(exts: Set[str]) -> Tuple[str, ...]:
+    """Expand extensions like ".nsp" to every upper/lower case spelling.
+
+    The result is fed to str.endswith, which checks the whole tuple in C.
+    All-lowercase and all-uppercase spellings come first since they are by
+    far the most common and endswith stops at the first match.
+    """
+    lower = sorted({e.lower() for e in exts})
+    mixed = [
+        "".join(chars)
+        for e in lower
+        for chars in itertools.product(*(dict.fromkeys((c, c.upper())) for c in e))
+    ]
+    return tuple(dict.fromkeys([*lower, *(e.upper() for e in lower), *mixed]))
+
+
+def _has_stem(name: str) -> bool:
+    """Whether name, known to end in an extension, has something before it.
+
+    Matches os.path.splitext, which ignores leading dots: ".nsp" and
+    "..nsp" have no extension, while "a.nsp" and ".a.nsp" do.
+    """
+    return "." in name.lstrip(".")
+
+
+def _iter_files(root: str, endings: Tuple[str, ...]) -> Iterator[str]:
+    """Yield paths of files under root whose name ends with one of endings.
+
+    Walks with os.scandir directly so each entry costs no extra stat call
+    and the extension is matched with one str.endswith call per name.
+    Subdirectories go on an explicit stack rather than recursing, so deep
+    trees neither nest generators nor hit the recursion limit.
+
+    Args:
+        root: Directory to search.
+        endings: Extension spellings from _endings().
+
+    Yields:
+        Matching file paths.
+    """
+    stack = deque([root])
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        try:
+            it = os.scandir(pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        push(entry.path)
+                        continue
+                except OSError:
+                    continue
+                name = entry.name
+                if name.endswith(endings) and _has_stem(name):
+                    yield entry.path
+
+
+# Walk results keyed by (root, endings) -> (root mtime_ns, sorted paths).
+# Used when a caller passes use_cache=True, as /files/search does unless
+# asked for fresh results. The root's mtime only changes when its immediate
+# children change, so edits deeper in the tree are not noticed until
+# invalidate_find_cache() is called; the services that write under Drive
+# call it when they finish.
+_scan_cache: Dict[Tuple[str, Tuple[str, ...]], Tuple[int, List[str]]] = {}
+_scan_cache_lock = threading.Lock()
+
+
+def invalidate_find_cache() -> None:
+    """Drop all cached find_archives()/find_games() results."""
+    with _scan_cache_lock:
+        _scan_cache.clear()
+
+
+def _find_files(root: str, exts: Set[str], use_cache: bool) -> List[str]:
+    endings = _endings(exts)
+    if not use_cache:
+        return list(_iter_files(root, endings))
+    try:
+        mtime_ns = os.stat(root).st_mtime_ns
+    except OSError:
+        return []
+    key = (root, endings)
+    with _scan_cache_lock:
+        cached = _scan_cache.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return list(cached[1])
+    paths = sorted(_iter_files(root, endings))
+    with _scan_cache_lock:
+        _scan_cache[key] = (mtime_ns, paths)
+    return list(paths)
+
+
+def iter_archives(root: str, exts: Optional[Set[str]] = None) -> Iterator[str]:
+    """Lazily yield archive files found recursively under root.
+
+    Paths are produced as the walk reaches them, so callers that only need
+    the first few matches (or want to start work early) don't wait for the
+    whole tree to be scanned.
+
+    Args:
+        root: Directory to search.
+        exts: Set of extensions to match. Defaults to config.archive_exts.
+
+    Yields:
+        Archive file paths, in walk order.
+    """
+    if exts is None:
+        exts = config.archive_exts
+    return _iter_files(root, _endings(exts))
+
+
+def find_archives(
+    root: str, exts: Optional[Set[str]] = None, use_cache: bool = False
+) -> List[str]:
     """Find all archive files recursively under root.
 
     Args:
         root: Directory to search.
         exts: Set of extensions to match. Defaults to config.archive_exts.
+        use_cache: Reuse the previous result while root's mtime is unchanged.
 
     Returns:
         List of archive file paths.
     """
+    if not use_cache:
+        return list(iter_archives(root, exts))
     if exts is None:
         exts = config.archive_exts
-    out: List[str] = []
-    for r, _, files in os.walk(root):
-        for f in files:
-            if os.path.splitext(f)[1].lower() in exts:
-                out.append(os.path.join(r, f))
-    return out
+    return _find_files(root, exts, use_cache)
 
 
-def find_games(root: str, exts: Optional[Set[str]] = None) -> List[str]:
+def find_games(
+    root: str, exts: Optional[Set[str]] = None, use_cache: bool = False
+) -> List[str]:
     """Find all game files (NSP/NSZ/XCI/XCZ) recursively under root.
 
     Args:
         root: Directory to search.
         exts: Set of extensions to match. Defaults to config.game_exts.
+        use_cache: Reuse the previous result while root's mtime is unchanged.
 
     Returns:
         Sorted list of game file paths.
     """
     if exts is None:
         exts = config.game_exts
-    out: List[str] = []
-    for r, _, files in os.walk(root):
-        for f in files:
-            if os.path.splitext(f)[1].lower() in exts:
-                out.append(os.path.join(r, f))
-    return sorted(out)
+    paths = _find_files(root, exts, use_cache)
+    if not use_cache:
+        paths.sort()
+    return paths
+
+
+# Shared pool for directory listings; each listing on the Drive mount is
+# a network round-trip, so many are kept in flight at once.
+_SCAN_WORKERS = 32
+_scan_pool = ThreadPoolExecutor(max_workers=_SCAN_WORKERS, thread_name_prefix="scan")
+
+
+def _scan_dir(dirpath: str, endings: Tuple[str, ...]) -> Tuple[List[str], List[str]]:
+    """List one directory (non-recursive).
+
+    Args:
+        dirpath: Directory to list.
+        endings: Extension spellings from _endings().
+
+    Returns:
+        Tuple of (matching file paths, subdirectory paths).
+    """
+    files: List[str] = []
+    subdirs: List[str] = []
+    try:
+        entries = os.scandir(dirpath)
+    except OSError:
+        return files, subdirs
+    # Hoisted out of the per-entry loop, which runs once per Drive entry
+    add_file = files.append
+    add_dir = subdirs.append
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    name = entry.name
+                    if name.endswith(endings) and _has_stem(name):
+                        add_file(entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    add_dir(entry.path)
+            except OSError:
+                continue
+    return files, subdirs
+
+
+# on_found batching thresholds for find_games_progressive
+_FOUND_BATCH = 64
+_FOUND_FLUSH_SECS = 0.05
 
 
 def find_games_progressive(
     root: str,
-    on_found: Callable[[str], None],
+    on_found: Callable[[List[str]], None],
     on_scanning: Optional[Callable[[str], None]] = None,
     exts: Optional[Set[str]] = None,
     is_cancelled: Optional[Callable[[], bool]] = None,
@@ -156,11 +438,17 @@ def find_games_progressive(
     """Find game files with progress callbacks using breadth-first search.
 
     Scans directories level by level (all depth-1 dirs, then depth-2, etc.)
-    to ensure files in shallow directories are found quickly.
+    to ensure files in shallow directories are found quickly. Directories
+    within a level are listed concurrently on a shared thread pool; the
+    callbacks always run on the calling thread.
+
+    Found paths are handed to on_found in batches, flushed once
+    _FOUND_BATCH paths have piled up or _FOUND_FLUSH_SECS have passed, so a
+    slow UI callback runs once per batch rather than once per file.
 
     Args:
         root: Directory to search.
-        on_found: Callback receiving each file path as it's found.
+        on_found: Callback receiving each batch of newly found file paths.
         on_scanning: Optional callback receiving current directory being scanned.
         exts: Set of extensions to match.
         is_cancelled: Optional callback returning True if scan should stop.
@@ -170,8 +458,18 @@ def find_games_progressive(
     """
     if exts is None:
         exts = config.game_exts
+    endings = _endings(exts)
 
     all_found: List[str] = []
+    batch: List[str] = []
+    last_flush = time.monotonic()
+
+    def flush() -> None:
+        nonlocal batch, last_flush
+        if batch:
+            on_found(batch)
+            batch = []
+        last_flush = time.monotonic()
 
     # Breadth-first: process directories level by level
     dirs_to_scan = [root]
@@ -182,48 +480,180 @@ def find_games_progressive(
             break
 
         next_level: List[str] = []
+        futures = {
+            _scan_pool.submit(_scan_dir, dirpath, endings): dirpath
+            for dirpath in dirs_to_scan
+        }
 
-        for dirpath in dirs_to_scan:
+        for future in as_completed(futures):
             # Check for cancellation
             if is_cancelled and is_cancelled():
+                for pending in futures:
+                    pending.cancel()
                 break
 
             # Report current directory
             if on_scanning:
-                rel_path = os.path.relpath(dirpath, root)
+                rel_path = os.path.relpath(futures[future], root)
                 if rel_path == ".":
                     rel_path = os.path.basename(root)
                 on_scanning(rel_path)
 
-            # Scan this directory (non-recursive)
-            try:
-                entries = os.scandir(dirpath)
-            except OSError:
-                continue
-
-            for entry in entries:
-                # Check for cancellation
-                if is_cancelled and is_cancelled():
-                    break
-
-                try:
-                    if entry.is_file(follow_symlinks=False):
-                        if os.path.splitext(entry.name)[1].lower() in exts:
-                            all_found.append(entry.path)
-                            on_found(entry.path)
-                    elif entry.is_dir(follow_symlinks=False):
-                        next_level.append(entry.path)
-                except OSError:
-                    continue
+            files, subdirs = future.result()
+            all_found.extend(files)
+            batch.extend(files)
+            if (
+                len(batch) >= _FOUND_BATCH
+                or time.monotonic() - last_flush >= _FOUND_FLUSH_SECS
+            ):
+                flush()
+            next_level.extend(subdirs)
 
         dirs_to_scan = next_level
 
+    flush()
     all_found.sort()
     return all_found
 
 
 ProgressCallback = Callable[[int, int], None]
 
+_COPY_CHUNK = 8 * 1024 * 1024
+_COPY_BUFFERS = 4
+_COPY_READERS = 2
+
+
+def _kernel_copy(
+    src_fd: int, dst_fd: int, total: int, on_prog: Optional[ProgressCallback]
+) -> Tuple[int, bool]:
+    """Copy between file descriptors without bouncing data through Python.
+
+    Tries os.copy_file_range, then os.sendfile. Either may be rejected by
+    the filesystem (e.g. FUSE mounts) or stop short, in which case the
+    caller finishes the copy from the returned offset.
+
+    Returns:
+        Tuple of (bytes copied, whether the copy reached total).
+    """
+    done = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while n := os.copy_file_range(src_fd, dst_fd, _COPY_CHUNK, done, done):
+                done += n
+                if on_prog:
+                    on_prog(done, total)
+        except OSError:
+            pass
+        if done >= total:
+            return done, True
+    if hasattr(os, "sendfile"):
+        try:
+            os.lseek(dst_fd, done, os.SEEK_SET)
+            while n := os.sendfile(dst_fd, src_fd, done, _COPY_CHUNK):
+                done += n
+                if on_prog:
+                    on_prog(done, total)
+        except OSError:
+            pass
+        if done >= total:
+            return done, True
+    return done, False
+
+
+def _read_chunk(
+    r: io.RawIOBase, buf: memoryview, offset: int, lock: threading.Lock
+) -> int:
+    """Fill buf from r at offset; short only at end of file."""
+    if not hasattr(os, "preadv"):
+        # No positional reads on this platform: serialize seek + read
+        with lock:
+            r.seek(offset)
+            got = 0
+            while got < len(buf) and (n := r.readinto(buf[got:])):
+                got += n
+            return got
+    fd = r.fileno()
+    got = 0
+    while got < len(buf) and (n := os.preadv(fd, [buf[got:]], offset + got)):
+        got += n
+    return got
+
+
+def _pipelined_copy(
+    r: io.RawIOBase,
+    w: io.RawIOBase,
+    done: int,
+    total: int,
+    on_prog: Optional[ProgressCallback],
+) -> int:
+    """Copy the rest of r into w, reading ahead on helper threads.
+
+    Several reader threads fetch consecutive chunks with positional reads,
+    so multiple Drive requests are in flight at once, while the calling
+    thread writes completed chunks out in file order. The buffers are
+    reused for the whole copy; a buffer only goes back to the readers once
+    it has been written out.
+
+    Returns:
+        Offset reached, i.e. done plus the bytes copied here.
+    """
+    bufs = [memoryview(bytearray(_COPY_CHUNK)) for _ in range(_COPY_BUFFERS)]
+    free: "queue.Queue[int]" = queue.Queue()
+    for i in range(len(bufs)):
+        free.put(i)
+    filled: "queue.Queue[Tuple[int, int, int, Optional[BaseException]]]" = queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    next_offset = [done]
+
+    def reader() -> None:
+        try:
+            while True:
+                i = free.get()
+                if stop.is_set():
+                    return
+                with lock:
+                    offset = next_offset[0]
+                    next_offset[0] += _COPY_CHUNK
+                n = _read_chunk(r, bufs[i], offset, lock)
+                filled.put((offset, i, n, None))
+                if n < _COPY_CHUNK:
+                    return
+        except BaseException as e:
+            filled.put((-1, -1, 0, e))
+
+    threads = [
+        threading.Thread(target=reader, daemon=True) for _ in range(_COPY_READERS)
+    ]
+    for t in threads:
+        t.start()
+    # Chunks can complete out of order; park them until their turn
+    pending: Dict[int, Tuple[int, int]] = {}
+    try:
+        while True:
+            offset, i, n, err = filled.get()
+            if err is not None:
+                raise err
+            pending[offset] = (i, n)
+            while done in pending:
+                i, n = pending.pop(done)
+                chunk = bufs[i][:n]
+                while chunk:
+                    chunk = chunk[w.write(chunk) :]
+                free.put(i)
+                done += n
+                if n and on_prog:
+                    on_prog(done, total)
+                if n < _COPY_CHUNK:
+                    return done
+    finally:
+        # Wake any reader waiting for a buffer, then wait for all of them
+        stop.set()
+        for _ in threads:
+            free.put(0)
+        for t in threads:
+            t.join()
+
 
 def copy_with_progress(
     src: str,
@@ -232,6 +662,9 @@ def copy_with_progress(
 ) -> int:
     """Copy file with progress callback.
 
+    Uses in-kernel copies where the platform and filesystems allow it and
+    falls back to a userspace read/write loop otherwise.
+
     Args:
         src: Source file path.
         dst: Destination file path.
@@ -241,12 +674,29 @@ def copy_with_progress(
         Total bytes copied.
     """
     os.makedirs(os.path.dirname(dst), exist_ok=True)
-    total = os.path.getsize(src)
-    done = 0
-    with open(src, "rb") as r, open(dst, "wb") as w:
-        while buf := r.read(8 * 1024 * 1024):
-            w.write(buf)
-            done += len(buf)
-            if on_prog:
-                on_prog(done, total)
+    # Unbuffered: every chunk is already large, so Python-level buffering
+    # would only add a copy.
+    with open(src, "rb", buffering=0) as r, open(dst, "wb", buffering=0) as w:
+        # fstat on the open handle rather than another path lookup on Drive
+        total = os.fstat(r.fileno()).st_size
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(r.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        # Reserve the destination up front so the filesystem can lay it out
+        # in one go instead of growing it chunk by chunk.
+        if total > 0 and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(w.fileno(), 0, total)
+            except OSError:
+                pass
+        done, finished = _kernel_copy(r.fileno(), w.fileno(), total, on_prog)
+        if not finished:
+            r.seek(done)
+            w.seek(done)
+            done = _pipelined_copy(r, w, done, total, on_prog)
+        if done < total:
+            # Source shrank mid-copy; drop the preallocated tail
+            w.truncate(done)
     return total